@@ -35,6 +35,10 @@ _SERIAL_DICT = {}
 # Set number of iterations used to compute timestamp offset
 _TIMESTAMP_OFFSET_ITERATIONS = 20
 
+# Set whether node commands get printed; callers which issue node commands at a high rate (e.g. GUI sliders) can
+# disable this with set_verbose()
+_VERBOSE = True
+
 
 # ------------------- #
 # "static" functions  #
@@ -45,10 +49,11 @@ def _node_cmd(cam, cam_node_str, cam_method_str, pyspin_mode_str=None, cam_node_
     """ Performs method on input cam node with optional access mode check """
 
     # Print command info
-    info_str = cam.GetUniqueID() + ' - executing: "' + '.'.join([cam_node_str, cam_method_str]) + '('
-    if cam_node_arg is not None:
-        info_str += str(cam_node_arg)
-    print(info_str + ')"')
+    if _VERBOSE:
+        info_str = cam.GetUniqueID() + ' - executing: "' + '.'.join([cam_node_str, cam_method_str]) + '('
+        if cam_node_arg is not None:
+            info_str += str(cam_node_arg)
+        print(info_str + ')"')
 
     # Get camera node
     cam_node = cam
@@ -394,6 +399,13 @@ def node_cmd(serial, cam_node_str, cam_method_str, pyspin_mode_str=None, cam_nod
                      cam_node_arg)
 
 
+def set_verbose(verbose):
+    """ Sets whether node commands get printed """
+    global _VERBOSE
+
+    _VERBOSE = verbose
+
+
 def update_timestamp_offset(serial):
     """ Updates timestamp offset """
 
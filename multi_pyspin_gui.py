@@ -8,20 +8,40 @@
 #   -spinnaker version:             spinnaker-1.23.0.27-amd64-Ubuntu18.04
 #   -spinnaker python version:      spinnaker_python-1.23.0.27-cp36-cp36m-linux_x86_64
 
+import os
 import sys
-import copy
 import time
 import queue
 import functools
+import threading
 from datetime import datetime
+from contextlib import suppress, contextmanager
 from tkinter import messagebox
 
 import numpy as np
 
+try:
+    import cv2  # Optional; only required for "cv2" display backend
+except ImportError:
+    cv2 = None
+
+try:
+    import numba  # Optional; copies and counts pixels of stream images in a single parallel pass
+except ImportError:
+    numba = None
+else:
+    # Kernel gets launched from stream threads; the TBB threading layer can hang at exit when launched from a thread
+    # other than the main thread, so use the workqueue layer unless the user has set NUMBA_THREADING_LAYER. Workqueue
+    # doesn't support concurrent launches, so launches get serialized with _NUMBA_LOCK; each launch already uses all
+    # cores.
+    if 'NUMBA_THREADING_LAYER' not in os.environ:
+        numba.config.THREADING_LAYER = 'workqueue'
+
 import matplotlib.pyplot as plt
 from matplotlib.widgets import TextBox
 from matplotlib.widgets import Button
 from matplotlib.widgets import Slider
+from matplotlib.patches import Polygon
 
 import PySpin
 
@@ -58,13 +78,45 @@ _STREAM_BUFFER_COUNT = 10  # TODO: Possibly calculate this dynamically...
 # Delay warning tolerance
 _DELAY_WARNING_TOLERANCE = 1e-3
 
-# Set number of histogram bins
+# Set number of histogram bins and bin edges, which only depend on the number of bins
 _NUM_HISTOGRAM_BINS = 50
+_HISTOGRAM_BIN_EDGES = np.linspace(-0.5, _NUM_HISTOGRAM_BINS - 0.5, _NUM_HISTOGRAM_BINS + 1)/(_NUM_HISTOGRAM_BINS - 1)
+
+# Set stride of pixels summed into an image "signature"; if signature doesn't change between stream frames (i.e. static
+# scene), the histogram doesn't get recomputed. Changes between sampled pixels don't change the signature, so pixels
+# still get fully recounted at least every _HISTOGRAM_RECOUNT_PERIOD seconds.
+_HISTOGRAM_SIGNATURE_STRIDE = 32
+_HISTOGRAM_RECOUNT_PERIOD = 1.0
+
+# Set slider debounce delay in seconds; only the final value of a burst of slider changes gets sent to the cameras
+_DEBOUNCE_DELAY = 0.15
+
+# Set stream display interval in ms; streams are acquired as fast as possible, but only the latest frame gets displayed
+_STREAM_INTERVAL = 33
+
+# Set display backend for stream images; either "matplotlib" or "cv2". "cv2" displays stream images in separate OpenCV
+# windows, which is much faster than matplotlib for large images; histograms and widgets always use matplotlib.
+_DISPLAY_BACKEND = 'matplotlib'
+
+# Set display skip; only every Nth acquired stream frame gets copied for display. Increase this to lower GUI load for
+# high frame rate streams; default is 1 since low frame rate streams would otherwise appear to stall
+_DISPLAY_SKIP = 1
+
+# Set queue handling interval in ms
+_QUEUE_INTERVAL = 10
 
 # GUI params
 _FIG = None
 _QUEUE = queue.Queue()
-_STREAMS = [False]
+_QUEUE_LOCK = threading.Lock()       # Held while queue is being handled
+_QUEUE_TIMER = None
+_STREAM_THREADS = [None]             # Thread of each stream; None if not streaming
+_STREAM_STOPS = [threading.Event()]  # Set to signal stream thread to stop
+_STREAM_TIMER = None
+_FRAMES = [None]                     # Latest frame of each stream
+_SPARE_FRAMES = [None]               # Plotted frame of each stream; its buffer gets reused by the stream thread
+_FRAMES_LOCK = threading.Lock()      # Only held while swapping frames so acquisition never waits on plotting
+_NUMBA_LOCK = threading.Lock()       # Held while numba kernel is running
 _IMSHOW_DICTS = [{}]
 _HIST_DICTS = [{}]
 _GUI_DICT = None
@@ -82,6 +134,31 @@ def _update_fig(fig):
     fig.canvas.flush_events()
 
 
+def _blit(axes, artist_dict, artists):
+    """ Redraws only the input artists over the cached axes background """
+
+    canvas = axes.figure.canvas
+
+    # Background gets cached after every full draw; if it doesn't exist yet then a full draw is required
+    if artist_dict.get('background') is None:
+        canvas.draw()
+        return
+
+    # Restore background, draw artists on top of it, then blit axes region
+    canvas.restore_region(artist_dict['background'])
+    for artist in artists:
+        axes.draw_artist(artist)
+    canvas.blit(axes.bbox)
+
+
+def _set_widget_val(widget, val):
+    """ Sets value of widget without triggering its callbacks """
+
+    widget.eventson = False
+    widget.set_val(val)
+    widget.eventson = True
+
+
 def _slider_with_text(fig, pos, slider_str, val_min, val_max, val_default, padding):
     """ Creates a slider with text box given a position """
 
@@ -368,22 +445,53 @@ def _multi_fig(fig, num_cams, gain_min, gain_max, gain_default, exposure_min, ex
             'counter_text': counter_text}
 
 
+def _downsample_stride(image_shape, image_axes):
+    """ Returns stride which downsamples image to about the on-screen size of the axes """
+
+    # Use same stride for both dimensions to preserve aspect ratio; downsampled image is never smaller than the axes
+    bbox = image_axes.bbox
+    return max(1, min(image_shape[0]//max(1, int(bbox.height)), image_shape[1]//max(1, int(bbox.width))))
+
+
 def _plot_image(image, max_val, image_axes, imshow_dict):
     """ plots image somewhat fast """
 
-    # If image hasn't been plotted yet or if image size changes, then we must replot imshow
-    if not imshow_dict or image.shape != imshow_dict['imshow_size']:
-        # Must reset axes and re-imshow()
+    # Get stride; only recompute it if image size changes or axes get resized. Displaying a downsampled image makes
+    # drawing cost depend on the size of the axes rather than the size of the sensor.
+    stride = imshow_dict.get('stride')
+    if stride is None or image.shape != imshow_dict['imshow_size']:
+        stride = _downsample_stride(image.shape, image_axes)
+    display_image = image[::stride, ::stride]
+
+    # Set extent to full image size so stride can change without changing extent
+    extent = (-0.5, image.shape[1]-0.5, image.shape[0]-0.5, -0.5)
+
+    # If image hasn't been plotted yet, then we must imshow()
+    if not imshow_dict:
+        # Must reset axes and imshow()
         image_axes.cla()
-        imshow_dict['imshow'] = image_axes.imshow(image, cmap='gray')
+        imshow_dict['imshow'] = image_axes.imshow(display_image,
+                                                  cmap='gray',
+                                                  extent=extent,
+                                                  animated=True)  # Animated so it can be blit
         imshow_dict['imshow_size'] = image.shape
+        imshow_dict['background'] = None  # Axes changed, so background must be recached
         image_axes.set_xticklabels([])
         image_axes.set_yticklabels([])
         image_axes.set_xticks([])
         image_axes.set_yticks([])
     else:
-        # Can just "set_data" since data is the same size and has the same max val
-        imshow_dict['imshow'].set_data(image)
+        # Can just "set_data"; this keeps the existing image, colormap, and norm
+        imshow_dict['imshow'].set_data(display_image)
+
+        # If image size changes, just update extent (which also updates axes limits)
+        if image.shape != imshow_dict['imshow_size']:
+            imshow_dict['imshow'].set_extent(extent)
+            imshow_dict['imshow_size'] = image.shape
+            imshow_dict['background'] = None  # Axes aspect changed, so background must be recached
+
+    # Store stride
+    imshow_dict['stride'] = stride
 
     # Set clim to max value
     imshow_dict['imshow'].set_clim(vmin=0, vmax=max_val)
@@ -391,30 +499,116 @@ def _plot_image(image, max_val, image_axes, imshow_dict):
     return imshow_dict
 
 
-def _plot_hist(image, max_val, num_bins, hist_axes, hist_dict):
+def _plot_image_cv2(image, max_val, window_name):
+    """ plots image in an OpenCV window """
+
+    # cv2.imshow() assumes 16 bit images use the full 16 bits, so shift images down to 8 bits
+    shift = max_val.bit_length() - 8
+    if shift > 0:
+        image = (image >> shift).astype(np.uint8)
+
+    # Show image; waitKey() is required for OpenCV to process its window events
+    cv2.imshow(window_name, image)
+    cv2.waitKey(1)
+
+
+@functools.lru_cache()
+def _hist_lut(max_val):
+    """ Returns lookup table which maps pixel values to histogram bins """
+
+    # Lookup table only depends on max value, so it gets cached. Matches np.histogram() binning over range (0, max_val);
+    # note that max_val is included in the last bin
+    return np.minimum(np.arange(max_val + 1)*_NUM_HISTOGRAM_BINS//max_val, _NUM_HISTOGRAM_BINS - 1)
+
+
+def _count_pixels(image, max_val):
+    """ Counts occurrences of each pixel value """
+
+    # Pixels are unsigned integers, so count each value in a single pass; histogram then gets computed by summing counts
+    # into bins, which is much faster than np.histogram(), since that must search bin edges for every pixel. Note that
+    # reshape() is a view (no copy) since image is C contiguous.
+    return np.bincount(image.reshape(-1), minlength=max_val + 1)
+
+
+if numba is not None:
+    @numba.njit(parallel=True, cache=True)
+    def _copy_and_count_pixels_numba(src, dst, num_counts, num_chunks):
+        """ Copies src image to dst image and counts occurrences of each pixel value in a single parallel pass """
+
+        # Split rows into chunks which get processed in parallel; each chunk has its own counts to avoid race conditions
+        num_rows = src.shape[0]
+        chunk_counts = np.zeros((num_chunks, num_counts), np.int64)
+        for chunk in numba.prange(num_chunks):
+            for i in range(chunk*num_rows//num_chunks, (chunk + 1)*num_rows//num_chunks):
+                for j in range(src.shape[1]):
+                    val = src[i, j]
+                    dst[i, j] = val
+                    if val < num_counts:
+                        chunk_counts[chunk, val] += 1
+
+        # Sum counts of chunks
+        counts = np.zeros(num_counts, np.int64)
+        for chunk in range(num_chunks):
+            counts += chunk_counts[chunk]
+
+        return counts
+
+
+def _warm_up_copy_and_count_pixels():
+    """ Compiles numba kernel on a tiny image so the first stream frame doesn't wait for compilation """
+
+    if numba is not None:
+        for dtype in (np.uint8, np.uint16):
+            src = np.zeros((2, 2), dtype)
+            _copy_and_count_pixels(src, np.empty_like(src), 1)
+
+
+def _copy_and_count_pixels(src, dst, max_val):
+    """ Copies src image to dst image and counts occurrences of each pixel value """
+
+    # Use fused parallel kernel if numba is available; otherwise copy then count
+    if numba is not None:
+        with _NUMBA_LOCK:
+            return _copy_and_count_pixels_numba(src, dst, max_val + 1, numba.get_num_threads())
+
+    np.copyto(dst, src)
+    return _count_pixels(dst, max_val)
+
+
+def _plot_hist(counts, max_val, hist_axes, hist_dict):
     """ plots histogram somewhat fast """
 
-    # Calculate histogram
-    hist, _ = np.histogram(image.ravel(), bins=num_bins, range=(0, max_val))
+    # Calculate histogram from pixel counts
+    hist = np.bincount(_hist_lut(max_val), weights=counts[:max_val + 1], minlength=_NUM_HISTOGRAM_BINS)
 
-    # If histogram hasn't been plotted yet or if number of bins changes, then we must replot histogram
-    if not hist_dict or hist_dict['num_bins'] != num_bins:
-        # Must reset axes and plot hist
+    # If histogram hasn't been plotted yet, then we must plot histogram
+    if not hist_dict:
+        # Must reset axes and plot hist. Histogram is a single polygon tracing the outline of the bars so heights can be
+        # updated with array assignments rather than updating each bar individually; vertices are:
+        # (edge_0, 0), (edge_0, hist_0), (edge_1, hist_0), (edge_1, hist_1), ..., (edge_N, hist_N-1), (edge_N, 0)
         hist_axes.cla()
-        hist_dict['bar'] = hist_axes.bar(np.linspace(0, 1, num_bins), hist, color='k', width=1/(num_bins-1))
-        hist_dict['num_bins'] = num_bins
+        hist_dict['verts'] = np.column_stack((np.repeat(_HISTOGRAM_BIN_EDGES, 2), np.zeros(2*_NUM_HISTOGRAM_BINS + 2)))
+        hist_dict['polygon'] = hist_axes.add_patch(Polygon(hist_dict['verts'],
+                                                           color='k',
+                                                           animated=True))  # Animated so it can be blit
+        hist_dict['background'] = None  # Axes changed, so background must be recached
+        hist_axes.set_xlim(_HISTOGRAM_BIN_EDGES[0], _HISTOGRAM_BIN_EDGES[-1])
         hist_axes.set_xticklabels([])
         hist_axes.set_yticklabels([])
         hist_axes.set_xticks([])
         hist_axes.set_yticks([])
-    else:
-        # Just reset height
-        for i, bar in enumerate(hist_dict['bar']):
-            bar.set_height(hist[i])
+
+    # Set heights
+    hist_dict['verts'][1:-1:2, 1] = hist
+    hist_dict['verts'][2:-1:2, 1] = hist
+    hist_dict['polygon'].set_xy(hist_dict['verts'])
 
     # Set height to max histogram value
     hist_axes.set_ylim(0, np.max(hist))
 
+    # Store counts so unchanged counts can be skipped
+    hist_dict['counts'] = counts
+
     return hist_dict
 
 
@@ -437,9 +631,13 @@ def _start_stream(cam_num):
     """ starts cam_num's stream """
 
     # Make sure cam_num isn't already streaming
-    if not _STREAMS[cam_num]:
+    if _STREAM_THREADS[cam_num] is None:
         serial = _get_and_validate_serial(cam_num)
 
+        # Make sure display backend is available
+        if _DISPLAY_BACKEND == 'cv2' and cv2 is None:
+            raise RuntimeError('"cv2" display backend requires OpenCV to be installed!')
+
         # Set buffer to newest only and acquisition mode to continuous
         multi_pyspin.node_cmd(serial, 'TLStream.StreamBufferHandlingMode', 'SetValue', 'RW', 'PySpin.StreamBufferHandlingMode_NewestOnly')
         multi_pyspin.node_cmd(serial, 'AcquisitionMode', 'SetValue', 'RW', 'PySpin.AcquisitionMode_Continuous')
@@ -447,8 +645,10 @@ def _start_stream(cam_num):
         # Start acquisition
         multi_pyspin.start_acquisition(serial)
 
-        # Set stream to true; do this last
-        _STREAMS[cam_num] = True
+        # Acquire images in separate thread; do this last
+        _STREAM_STOPS[cam_num].clear()
+        _STREAM_THREADS[cam_num] = threading.Thread(target=_stream, args=(cam_num,), daemon=True)
+        _STREAM_THREADS[cam_num].start()
 
         print(serial + ' - stream started')
 
@@ -457,94 +657,230 @@ def _stop_stream(cam_num):
     """ stops cam_num's stream """
 
     # Make sure cam_num is streaming
-    if _STREAMS[cam_num]:
-        # Set stream to false; do this first
-        _STREAMS[cam_num] = False
+    if _STREAM_THREADS[cam_num] is not None:
+        # Signal stream thread to stop and wait for it to finish before ending acquisition; do this first
+        _STREAM_STOPS[cam_num].set()
+        _STREAM_THREADS[cam_num].join()
+        _STREAM_THREADS[cam_num] = None
 
         # Stop acquisition
         serial = _get_and_validate_serial(cam_num)
         multi_pyspin.end_acquisition(serial)
 
+        # Clear frames
+        with _FRAMES_LOCK:
+            _FRAMES[cam_num] = None
+            _SPARE_FRAMES[cam_num] = None
+
+        # Close OpenCV window
+        if _DISPLAY_BACKEND == 'cv2':
+            with suppress(cv2.error):  # Window might not have been created yet
+                cv2.destroyWindow(_cv2_window_name(cam_num))
+
         print(serial + ' - stream stopped')
 
 
 def _stop_streams():
     """ attempts to stop all streams """
 
+    # Signal all stream threads first, then stop primary camera last (assumed to be first camera); secondary cameras
+    # might be triggered by the primary camera, so their threads would otherwise wait on the image timeout when joined.
     for cam_num in range(_NUM_CAMS):
+        if _STREAM_THREADS[cam_num] is not None:
+            _STREAM_STOPS[cam_num].set()
+    for cam_num in reversed(range(_NUM_CAMS)):
         _stop_stream(cam_num)
 
 
-def _set_gain_text(cam_num, gain):
-    """ sets gain for text """
+def _cv2_window_name(cam_num):
+    """ Returns OpenCV window name for cam_num """
+
+    return 'Cam ' + str(cam_num + 1)
+
 
-    # Get gain text
-    gain_text = _GUI_DICT['cam_plot_dicts'][cam_num]['gain_text']
+def _stream(cam_num):
+    """ acquires images from cam_num's stream and stores the latest one; this runs in its own thread """
+
+    # Cache lookups outside of loop
+    serial = _get_and_validate_serial(cam_num)
+    stop = _STREAM_STOPS[cam_num]
+    get_image = multi_pyspin.get_image
+
+    num_frame = 0
+    frame = None       # Frame being written to by this thread
+    signature = None   # Signature of last frame
+    counts = None      # Pixel counts of last frame
+    count_time = None  # Time pixels were last counted
+    while not stop.is_set():
+        try:
+            # Get image dict
+            image_dict = get_image(serial, _IMAGE_TIMEOUT)
+
+            # Make sure image is complete
+            if image_dict:
+                # Skip frames which won't be displayed; still acquire them so the camera keeps running at full frame
+                # rate
+                skip = num_frame % _DISPLAY_SKIP != 0
+                num_frame += 1
+                if skip:
+                    image_dict['image'].Release()
+                    continue
+
+                # Reuse spare frame (if it exists) so image buffers don't get allocated for every frame
+                if frame is None:
+                    with _FRAMES_LOCK:
+                        frame, _SPARE_FRAMES[cam_num] = _SPARE_FRAMES[cam_num], None
+
+                # Copy image data so buffer can be released right away and count pixels while image is in cache; this
+                # keeps the full pass over the image out of the GUI thread, which only bins counts into the histogram.
+                # Both numpy and numba release the GIL here, so other streams and the GUI can run in the meantime.
+                try:
+                    image = image_dict['image'].GetNDArray()
+                    if frame is None or frame['image'].shape != image.shape or frame['image'].dtype != image.dtype:
+                        frame = {'image': np.empty(image.shape, image.dtype)}
+                    frame['max_val'] = 2**image_dict['bitsperpixel'] - 1
+
+                    # If image is (nearly) unchanged, reuse last counts; this only sums a small subset of pixels. Counts
+                    # get recomputed periodically regardless so changes missed by the signature don't stay stale.
+                    signature_prev = signature
+                    signature = (image.shape,
+                                 frame['max_val'],
+                                 int(image[::_HISTOGRAM_SIGNATURE_STRIDE, ::_HISTOGRAM_SIGNATURE_STRIDE].sum()))
+                    now = time.monotonic()
+                    if signature == signature_prev and now - count_time < _HISTOGRAM_RECOUNT_PERIOD:
+                        np.copyto(frame['image'], image)
+                    else:
+                        counts = _copy_and_count_pixels(image, frame['image'], frame['max_val'])
+                        count_time = now
+                    frame['counts'] = counts
+                finally:
+                    image_dict['image'].Release()
+
+                # Store latest frame; if previous frame hasn't been plotted yet, it gets dropped and its buffer gets
+                # reused
+                with _FRAMES_LOCK:
+                    _FRAMES[cam_num], frame = frame, _FRAMES[cam_num]
+        except Exception as e:
+            # If exception occurs (acquiring, copying or counting), disable this stream and report error from main
+            # thread; if stop was requested, exception is expected (e.g. image timeout), so just exit
+            if not stop.is_set():
+                _stream_error_wrapped(cam_num, threading.current_thread(), e)
+            break
 
-    # Update text
-    gain_text.eventson = False
-    gain_text.set_val(gain)
-    gain_text.eventson = True
 
+def _plot_streams():
+    """ plots latest frame of each stream; this gets called periodically by the stream timer """
 
-def _set_gain_slider(cam_num, gain):
-    """ sets gain for slider """
+    for cam_num in range(_NUM_CAMS):
+        # Take latest frame
+        with _FRAMES_LOCK:
+            frame, _FRAMES[cam_num] = _FRAMES[cam_num], None
 
-    # Get gain slider
-    gain_slider = _GUI_DICT['cam_plot_dicts'][cam_num]['gain_slider']
+        if frame is not None:
+            # Plot frame; this runs directly from the stream timer, so if exception occurs, disable this stream and
+            # report error from queue rather than letting it stop the timer
+            try:
+                # Get axes
+                image_axes = _GUI_DICT['cam_plot_dicts'][cam_num]['image_axes']
+                hist_axes = _GUI_DICT['cam_plot_dicts'][cam_num]['hist_axes']
 
-    # Update slider
-    gain_slider.eventson = False
-    gain_slider.set_val(gain)
-    gain_slider.eventson = True
+                # Plot image; blit it to avoid redrawing the entire figure
+                if _DISPLAY_BACKEND == 'cv2':
+                    _plot_image_cv2(frame['image'], frame['max_val'], _cv2_window_name(cam_num))
+                else:
+                    imshow_dict = _plot_image(frame['image'], frame['max_val'], image_axes, _IMSHOW_DICTS[cam_num])
+                    _IMSHOW_DICTS[cam_num] = imshow_dict
+                    _blit(image_axes, imshow_dict, [imshow_dict['imshow']])
 
+                # Plot histogram if pixel counts changed; blit it to avoid redrawing the entire figure
+                if frame['counts'] is not _HIST_DICTS[cam_num].get('counts'):
+                    hist_dict = _plot_hist(frame['counts'], frame['max_val'], hist_axes, _HIST_DICTS[cam_num])
+                    _HIST_DICTS[cam_num] = hist_dict
+                    _blit(hist_axes, hist_dict, [hist_dict['polygon']])
 
-def _set_exposure_text(exposure):
-    """ sets exposure for text """
+                # Frame has been plotted (image data gets copied when plotted), so its buffer can be reused
+                with _FRAMES_LOCK:
+                    _SPARE_FRAMES[cam_num] = frame
+            except Exception as e:
+                _stream_error_wrapped(cam_num, _STREAM_THREADS[cam_num], e)
 
-    # Get exposure text
-    exposure_text = _GUI_DICT['exposure_text']
 
-    # Update text
-    exposure_text.eventson = False
-    exposure_text.set_val(exposure)
-    exposure_text.eventson = True
+def _cache_backgrounds(_):
+    """ draw_event callback; caches axes backgrounds for blitting and redraws animated artists """
 
+    # Animated artists are skipped during a full draw, so cache the "clean" background and then draw them on top
+    for cam_num in range(min(_NUM_CAMS, len(_GUI_DICT['cam_plot_dicts']))):
+        cam_plot_dict = _GUI_DICT['cam_plot_dicts'][cam_num]
 
-def _set_exposure_slider(exposure):
-    """ sets exposure for slider """
+        # image
+        imshow_dict = _IMSHOW_DICTS[cam_num]
+        if imshow_dict:
+            imshow_dict['background'] = _FIG.canvas.copy_from_bbox(cam_plot_dict['image_axes'].bbox)
+            cam_plot_dict['image_axes'].draw_artist(imshow_dict['imshow'])
 
-    # Get exposure slider
-    exposure_slider = _GUI_DICT['exposure_slider']
+        # histogram
+        hist_dict = _HIST_DICTS[cam_num]
+        if hist_dict:
+            hist_dict['background'] = _FIG.canvas.copy_from_bbox(cam_plot_dict['hist_axes'].bbox)
+            cam_plot_dict['hist_axes'].draw_artist(hist_dict['polygon'])
 
-    # Update slider
-    exposure_slider.eventson = False
-    exposure_slider.set_val(exposure)
-    exposure_slider.eventson = True
 
+def _reset_strides(_):
+    """ resize_event callback; resets downsample strides so they get recomputed for the new axes size """
 
-def _set_fps_text(fps):
-    """ sets fps for text """
+    for imshow_dict in _IMSHOW_DICTS:
+        if imshow_dict:
+            imshow_dict['stride'] = None
 
-    # Get fps text
-    fps_text = _GUI_DICT['fps_text']
 
-    # Update text
-    fps_text.eventson = False
-    fps_text.set_val(fps)
-    fps_text.eventson = True
+def _handle_queue():
+    """ runs queued functions; this gets called periodically by the queue timer """
 
+    # Figure updates process events, which would allow this to be re-entered in the middle of a long running function
+    # (e.g. saving images); skip if queue is already being handled
+    if not _QUEUE_LOCK.acquire(blocking=False):
+        return
 
-def _set_fps_slider(fps):
-    """ sets fps for slider """
+    try:
+        while not _QUEUE.empty():
+            func, args, kwargs = _QUEUE.get()
 
-    # Get fps slider
-    fps_slider = _GUI_DICT['fps_slider']
+            # Attempt to run function and update fig, if it fails, display an error message box and continue; this runs
+            # from the queue timer, which stops if an exception escapes
+            try:
+                try:
+                    func(*args, **kwargs)
+                finally:
+                    # Update fig
+                    _update_fig(_FIG)
+            except Exception as e:
+                messagebox.showerror("Error", str(e))
+    finally:
+        _QUEUE_LOCK.release()
 
-    # Update slider
-    fps_slider.eventson = False
-    fps_slider.set_val(fps)
-    fps_slider.eventson = True
+
+def _close(_):
+    """ close_event callback; stops timers and streams """
+
+    print('Cleaning up multi_pyspin_gui...')
+
+    # Stop timers
+    _STREAM_TIMER.stop()
+    _QUEUE_TIMER.stop()
+
+    # Stop all streams
+    _stop_streams()
+
+
+@contextmanager
+def _quiet_node_cmds():
+    """ disables printing of node commands; gain, exposure and fps get set at a high rate from sliders """
+
+    multi_pyspin.set_verbose(False)
+    try:
+        yield
+    finally:
+        multi_pyspin.set_verbose(True)
 
 
 def _set_image_timeout(cam_num):
@@ -561,6 +897,14 @@ def _set_image_timeout(cam_num):
     print(serial + ' - effective framerate: ' + str(fps) + '; image timeout set to: ' + str(_IMAGE_TIMEOUT))
 
 
+def _set_gain(cam_num, gain):
+    """ Sets gain for camera """
+
+    serial = _get_and_validate_serial(cam_num)
+    with _quiet_node_cmds():
+        multi_pyspin.set_gain(serial, gain)
+
+
 def _set_exposure(exposure):
     """ Tries to set exposure for all cameras """
 
@@ -571,11 +915,10 @@ def _set_exposure(exposure):
         except:
             continue
 
-        # Set exposure
-        multi_pyspin.set_exposure(serial, exposure)
-
-        # Update image timeout
-        _set_image_timeout(cam_num)
+        # Set exposure and update image timeout
+        with _quiet_node_cmds():
+            multi_pyspin.set_exposure(serial, exposure)
+            _set_image_timeout(cam_num)
 
 
 def _set_fps(fps):
@@ -588,11 +931,10 @@ def _set_fps(fps):
         except:
             continue
 
-        # Set fps
-        multi_pyspin.set_frame_rate(serial, fps)
-
-        # Update image timeout
-        _set_image_timeout(cam_num)
+        # Set fps and update image timeout
+        with _quiet_node_cmds():
+            multi_pyspin.set_frame_rate(serial, fps)
+            _set_image_timeout(cam_num)
 
 
 def _save_images(cam_nums):
@@ -611,7 +953,7 @@ def _save_images(cam_nums):
         num_images = int(num_images)
 
     # Cache streams
-    streams = copy.deepcopy(_STREAMS)
+    streams = [stream_thread is not None for stream_thread in _STREAM_THREADS]
 
     # Disable all active streams
     _stop_streams()
@@ -740,10 +1082,76 @@ def _queue_wrapper(func):
     return _wrapped_func
 
 
+def _debounce_wrapper(func):
+    """ wraps function such that it only gets called once calls with the same args stop for _DEBOUNCE_DELAY seconds """
+
+    timers = {}
+
+    @functools.wraps(func)
+    def _wrapped_func(*args, **kwargs):
+        """ wrapped function """
+
+        # Cancel pending call (if it exists) and reschedule
+        if args in timers:
+            timers[args].cancel()
+        timers[args] = threading.Timer(_DEBOUNCE_DELAY, func, args, kwargs)
+        timers[args].daemon = True
+        timers[args].start()
+
+    return _wrapped_func
+
+
+def _param_wrapped(slider, text, setter, val_min):
+    """ Returns slider and text callbacks which set a camera param and keep slider and text in sync """
+
+    @_debounce_wrapper
+    @_queue_wrapper
+    def _slider_wrapped():
+        """ slider callback """
+
+        # Get value
+        val = slider.val
+
+        try:
+            # Set value for camera(s)
+            setter(val)
+        except:
+            # Set value back to text value
+            val = float(text.text) if text.text else val_min
+            _set_widget_val(slider, val)
+            raise  # Reraise
+
+        # set text
+        _set_widget_val(text, val)
+
+    @_queue_wrapper
+    def _text_wrapped():
+        """ text callback """
+
+        # Get value
+        if not text.text:
+            return
+        val = float(text.text)
+
+        try:
+            # Set value for camera(s)
+            setter(val)
+        except:
+            # Set value back to slider value
+            _set_widget_val(text, slider.val)
+            raise  # Reraise
+
+        # set slider
+        _set_widget_val(slider, val)
+
+    return _slider_wrapped, _text_wrapped
+
+
 @_queue_wrapper
 def _num_cams_wrapped():
     """ Handles changing the number of cameras """
-    global _NUM_CAMS, _SERIALS, _STREAMS, _IMSHOW_DICTS, _HIST_DICTS, _GUI_DICT
+    global _NUM_CAMS, _SERIALS, _STREAM_THREADS, _STREAM_STOPS, _FRAMES, _SPARE_FRAMES, _IMSHOW_DICTS, _HIST_DICTS, \
+        _GUI_DICT
 
     # Get num_cams_text
     num_cams_text = _GUI_DICT['num_cams_text']
@@ -765,7 +1173,10 @@ def _num_cams_wrapped():
 
     # Reset camera related lists; DO NOT do "[{}] * _NUM_CAMS", as this makes a duplicate reference
     _SERIALS = [None for _ in range(_NUM_CAMS)]
-    _STREAMS = [False for _ in range(_NUM_CAMS)]
+    _STREAM_THREADS = [None for _ in range(_NUM_CAMS)]
+    _STREAM_STOPS = [threading.Event() for _ in range(_NUM_CAMS)]
+    _FRAMES = [None for _ in range(_NUM_CAMS)]
+    _SPARE_FRAMES = [None for _ in range(_NUM_CAMS)]
     _IMSHOW_DICTS = [{} for _ in range(_NUM_CAMS)]
     _HIST_DICTS = [{} for _ in range(_NUM_CAMS)]
 
@@ -800,8 +1211,8 @@ def _setup_wrapped(cam_num_new):
 
     # Set Gain
     gain_new = multi_pyspin.get_gain(serial_new)
-    _set_gain_text(cam_num_new, gain_new)
-    _set_gain_slider(cam_num_new, gain_new)
+    _set_widget_val(_GUI_DICT['cam_plot_dicts'][cam_num_new]['gain_text'], gain_new)
+    _set_widget_val(_GUI_DICT['cam_plot_dicts'][cam_num_new]['gain_slider'], gain_new)
 
     # Set Exposure
     exposure_new = multi_pyspin.get_exposure(serial_new)
@@ -818,8 +1229,8 @@ def _setup_wrapped(cam_num_new):
             exposure_new = exposure
             multi_pyspin.set_exposure(serial_new, exposure_new)
             break
-    _set_exposure_text(exposure_new)
-    _set_exposure_slider(exposure_new)
+    _set_widget_val(_GUI_DICT['exposure_text'], exposure_new)
+    _set_widget_val(_GUI_DICT['exposure_slider'], exposure_new)
 
     # Set FPS
     fps_new = multi_pyspin.get_frame_rate(serial_new)
@@ -836,8 +1247,8 @@ def _setup_wrapped(cam_num_new):
             fps_new = fps
             multi_pyspin.set_frame_rate(serial_new, fps_new)
             break
-    _set_fps_text(fps_new)
-    _set_fps_slider(fps_new)
+    _set_widget_val(_GUI_DICT['fps_text'], fps_new)
+    _set_widget_val(_GUI_DICT['fps_slider'], fps_new)
 
     # Store serial
     _SERIALS[cam_num_new] = serial_new
@@ -860,147 +1271,6 @@ def _stop_stream_wrapped(cam_num):
     _stop_stream(cam_num)
 
 
-@_queue_wrapper
-def _gain_slider_wrapped(cam_num):
-    """ gain slider callback """
-
-    # Get gain value
-    gain = _GUI_DICT['cam_plot_dicts'][cam_num]['gain_slider'].val
-
-    try:
-        # Set gain for camera
-        serial = _get_and_validate_serial(cam_num)
-        multi_pyspin.set_gain(serial, gain)
-    except:
-        # Set value back to text value
-        gain = _GUI_DICT['cam_plot_dicts'][cam_num]['gain_text'].text
-        if not gain:
-            gain = _GAIN_MIN
-        else:
-            gain = float(gain)
-        _set_gain_slider(cam_num, gain)
-        raise  # Reraise
-
-    # set gain text
-    _set_gain_text(cam_num, gain)
-
-
-@_queue_wrapper
-def _gain_text_wrapped(cam_num):
-    """ gain text callback """
-
-    # Get gain value
-    gain = _GUI_DICT['cam_plot_dicts'][cam_num]['gain_text'].text
-    if not gain:
-        return
-    gain = float(gain)
-
-    try:
-        # Set gain for camera
-        serial = _get_and_validate_serial(cam_num)
-        multi_pyspin.set_gain(serial, gain)
-    except:
-        # Set value back to slider value
-        gain = _GUI_DICT['cam_plot_dicts'][cam_num]['gain_slider'].val
-        _set_gain_text(cam_num, gain)
-        raise  # Reraise
-
-    # set gain slider
-    _set_gain_slider(cam_num, gain)
-
-
-@_queue_wrapper
-def _exposure_slider_wrapped():
-    """ exposure slider callback """
-
-    exposure = _GUI_DICT['exposure_slider'].val
-
-    try:
-        # Set exposure for cameras
-        _set_exposure(exposure)
-    except:
-        # Set value back to text value
-        exposure = _GUI_DICT['exposure_text'].text
-        if not exposure:
-            exposure = _EXPOSURE_MIN
-        else:
-            exposure = float(exposure)
-        _set_exposure_slider(exposure)
-        raise  # Reraise
-
-    # set exposure text
-    _set_exposure_text(exposure)
-
-
-@_queue_wrapper
-def _exposure_text_wrapped():
-    """ exposure text callback """
-
-    # Get exposure value
-    exposure = _GUI_DICT['exposure_text'].text
-    if not exposure:
-        return
-    exposure = float(exposure)
-
-    try:
-        # Set exposure for cameras
-        _set_exposure(exposure)
-    except:
-        # Set value back to slider value
-        exposure = _GUI_DICT['exposure_slider'].val
-        _set_exposure_text(exposure)
-        raise  # Reraise
-
-    # set exposure slider
-    _set_exposure_slider(exposure)
-
-
-@_queue_wrapper
-def _fps_slider_wrapped():
-    """ fps slider callback """
-
-    fps = _GUI_DICT['fps_slider'].val
-
-    try:
-        # Set fps for cameras
-        _set_fps(fps)
-    except:
-        # Set value back to text value
-        fps = _GUI_DICT['fps_text'].text
-        if not fps:
-            fps = _FPS_MIN
-        else:
-            fps = float(fps)
-        _set_fps_slider(fps)
-        raise  # Reraise
-
-    # set fps text
-    _set_fps_text(fps)
-
-
-@_queue_wrapper
-def _fps_text_wrapped():
-    """ fps text callback """
-
-    # Get fps value
-    fps = _GUI_DICT['fps_text'].text
-    if not fps:
-        return
-    fps = float(fps)
-
-    try:
-        # Set fps for cameras
-        _set_fps(fps)
-    except:
-        # Set value back to slider value
-        fps = _GUI_DICT['fps_slider'].val
-        _set_fps_text(fps)
-        raise  # Reraise
-
-    # set fps slider
-    _set_fps_slider(fps)
-
-
 @_queue_wrapper
 def _save_single_image_wrapped(cam_num):
     """ Saves single image """
@@ -1018,46 +1288,14 @@ def _save_multi_image_wrapped():
 
 
 @_queue_wrapper
-def _stream_images_wrapped():
-    """ stream update of images """
+def _stream_error_wrapped(cam_num, thread, e):
+    """ Handles error from stream thread """
 
-    # Get image dicts
-    image_dicts = [{} for _ in range(_NUM_CAMS)]
-    for cam_num in range(_NUM_CAMS):
-        if _STREAMS[cam_num]:
-            try:
-                # Get image dict
-                serial = _get_and_validate_serial(cam_num)
-                image_dicts[cam_num] = multi_pyspin.get_image(serial, _IMAGE_TIMEOUT)
-            except:
-                # If exception occurs, disable this stream
-                _stop_stream(cam_num)
-                raise  # Reraise error
+    # Make sure error is from current stream; stream might have been stopped or restarted since error was queued
+    if _STREAM_THREADS[cam_num] is thread:
+        _stop_stream(cam_num)
 
-    # Plot images
-    for cam_num in range(_NUM_CAMS):
-        if _STREAMS[cam_num]:
-            if image_dicts[cam_num]:
-                # Get image as numpy array
-                image = image_dicts[cam_num]['image'].GetNDArray()
-
-                # Plot image
-                _IMSHOW_DICTS[cam_num] = _plot_image(image,
-                                                     2**image_dicts[cam_num]['bitsperpixel'] - 1,
-                                                     _GUI_DICT['cam_plot_dicts'][cam_num]['image_axes'],
-                                                     _IMSHOW_DICTS[cam_num])
-
-                # Plot histogram
-                _HIST_DICTS[cam_num] = _plot_hist(image,
-                                                  2**image_dicts[cam_num]['bitsperpixel'] - 1,
-                                                  _NUM_HISTOGRAM_BINS,
-                                                  _GUI_DICT['cam_plot_dicts'][cam_num]['hist_axes'],
-                                                  _HIST_DICTS[cam_num])
-
-    # Release images
-    for cam_num in range(_NUM_CAMS):
-        if _STREAMS[cam_num]:
-            image_dicts[cam_num]['image'].Release()
+        raise e
 
 
 # ------------------- #
@@ -1068,26 +1306,40 @@ def _stream_images_wrapped():
 def _set_multi_fig_callbacks():
     """ Sets multi fig callbacks """
 
-    # All callbacks are wrapped so they get inserted into a queue first before running
+    # All callbacks are wrapped so they get inserted into a queue first before running; slider callbacks are also
+    # debounced so cameras don't get reprogrammed for every intermediate value
 
     # num cams
     _GUI_DICT['num_cams_button'].on_clicked(lambda _: _num_cams_wrapped())
 
     # cam plots
     for i in range(len(_GUI_DICT['cam_plot_dicts'])):
-        _GUI_DICT['cam_plot_dicts'][i]['setup_button'].on_clicked(lambda _, i=i: _setup_wrapped(i))
-        _GUI_DICT['cam_plot_dicts'][i]['start_stream_button'].on_clicked(lambda _, i=i: _start_stream_wrapped(i))
-        _GUI_DICT['cam_plot_dicts'][i]['stop_stream_button'].on_clicked(lambda _, i=i: _stop_stream_wrapped(i))
-        _GUI_DICT['cam_plot_dicts'][i]['gain_slider'].on_changed(lambda _, i=i: _gain_slider_wrapped(i))
-        _GUI_DICT['cam_plot_dicts'][i]['gain_text'].on_submit(lambda _, i=i: _gain_text_wrapped(i))
+        cam_plot_dict = _GUI_DICT['cam_plot_dicts'][i]
+        cam_plot_dict['setup_button'].on_clicked(lambda _, i=i: _setup_wrapped(i))
+        cam_plot_dict['start_stream_button'].on_clicked(lambda _, i=i: _start_stream_wrapped(i))
+        cam_plot_dict['stop_stream_button'].on_clicked(lambda _, i=i: _stop_stream_wrapped(i))
+        gain_slider_wrapped, gain_text_wrapped = _param_wrapped(cam_plot_dict['gain_slider'],
+                                                                cam_plot_dict['gain_text'],
+                                                                functools.partial(_set_gain, i),
+                                                                _GAIN_MIN)
+        cam_plot_dict['gain_slider'].on_changed(lambda _, f=gain_slider_wrapped: f())
+        cam_plot_dict['gain_text'].on_submit(lambda _, f=gain_text_wrapped: f())
 
     # exposure
-    _GUI_DICT['exposure_slider'].on_changed(lambda _: _exposure_slider_wrapped())
-    _GUI_DICT['exposure_text'].on_submit(lambda _: _exposure_text_wrapped())
+    exposure_slider_wrapped, exposure_text_wrapped = _param_wrapped(_GUI_DICT['exposure_slider'],
+                                                                    _GUI_DICT['exposure_text'],
+                                                                    _set_exposure,
+                                                                    _EXPOSURE_MIN)
+    _GUI_DICT['exposure_slider'].on_changed(lambda _: exposure_slider_wrapped())
+    _GUI_DICT['exposure_text'].on_submit(lambda _: exposure_text_wrapped())
 
     # fps
-    _GUI_DICT['fps_slider'].on_changed(lambda _: _fps_slider_wrapped())
-    _GUI_DICT['fps_text'].on_submit(lambda _: _fps_text_wrapped())
+    fps_slider_wrapped, fps_text_wrapped = _param_wrapped(_GUI_DICT['fps_slider'],
+                                                          _GUI_DICT['fps_text'],
+                                                          _set_fps,
+                                                          _FPS_MIN)
+    _GUI_DICT['fps_slider'].on_changed(lambda _: fps_slider_wrapped())
+    _GUI_DICT['fps_text'].on_submit(lambda _: fps_text_wrapped())
 
     # save cam buttons
     for i in range(len(_GUI_DICT['save_cam_buttons'])):
@@ -1104,11 +1356,14 @@ def _set_multi_fig_callbacks():
 
 def main():
     """ Main program """
-    global _NUM_CAMS, _SERIALS, _IMAGE_TIMEOUT, _FIG, _QUEUE, _STREAMS, _IMSHOW_DICTS, _HIST_DICTS, _GUI_DICT
+    global _NUM_CAMS, _SERIALS, _IMAGE_TIMEOUT, _FIG, _QUEUE, _STREAM_THREADS, _STREAM_STOPS, _STREAM_TIMER, _FRAMES, \
+        _SPARE_FRAMES, _IMSHOW_DICTS, _HIST_DICTS, _GUI_DICT, _QUEUE_TIMER
+
+    # Compile numba kernel (if available) up front rather than on the first stream frame
+    _warm_up_copy_and_count_pixels()
 
     # Create figure
     _FIG = plt.figure()
-    _FIG.show()  # Display it
 
     # Set GUI
     _GUI_DICT = _multi_fig(_FIG,
@@ -1125,39 +1380,27 @@ def main():
     # Set callbacks
     _set_multi_fig_callbacks()
 
-    # Update plot while figure exists
-    # noinspection PyBroadException
-    try:
-        while plt.fignum_exists(_FIG.number):
-            # Handle streams
-            if any(_STREAMS):
-                _stream_images_wrapped()
-
-            # Handle queue
-            while not _QUEUE.empty():
-                func, args, kwargs = _QUEUE.get()
+    # Cache backgrounds after every full draw (e.g. resizing, widget updates) so streams can be blit
+    _FIG.canvas.mpl_connect('draw_event', _cache_backgrounds)
 
-                # Attempt to run function, if it fails, display an error message box and continue
-                try:
-                    func(*args, **kwargs)
-                except Exception as e:
-                    messagebox.showerror("Error", str(e))
+    # Recompute downsample strides when figure is resized
+    _FIG.canvas.mpl_connect('resize_event', _reset_strides)
 
-                # Update fig
-                _update_fig(_FIG)
+    # Plot latest frames periodically; acquisition happens in stream threads
+    _STREAM_TIMER = _FIG.canvas.new_timer(interval=_STREAM_INTERVAL)
+    _STREAM_TIMER.add_callback(_plot_streams)
+    _STREAM_TIMER.start()
 
-            # Update fig
-            _update_fig(_FIG)
-    except:
-        # Only re-raise error if figure is still open
-        time.sleep(1)  # I think this will let figure actually close
-        if plt.fignum_exists(_FIG.number):
-            raise
+    # Handle queue periodically
+    _QUEUE_TIMER = _FIG.canvas.new_timer(interval=_QUEUE_INTERVAL)
+    _QUEUE_TIMER.add_callback(_handle_queue)
+    _QUEUE_TIMER.start()
 
-    print('Cleaning up multi_pyspin_gui...')
+    # Stop timers and streams when figure gets closed
+    _FIG.canvas.mpl_connect('close_event', _close)
 
-    # Stop all streams
-    _stop_streams()
+    # Run event loop; this blocks until figure is closed
+    plt.show()
 
     # Clean up
     _NUM_CAMS = 1
@@ -1165,10 +1408,15 @@ def main():
     _IMAGE_TIMEOUT = None
     _FIG = None
     _QUEUE = queue.Queue()
-    _STREAMS = [False]
+    _STREAM_THREADS = [None]
+    _STREAM_STOPS = [threading.Event()]
+    _STREAM_TIMER = None
+    _FRAMES = [None]
+    _SPARE_FRAMES = [None]
     _IMSHOW_DICTS = [{}]
     _HIST_DICTS = [{}]
     _GUI_DICT = None
+    _QUEUE_TIMER = None
 
     return 0
 